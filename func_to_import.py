@@ -1,12 +1,28 @@
 import os
 import re
+import functools
 import traceback
 import zipfile
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 import fitz  # PyMuPDF
 import pytesseract
 from PIL import Image
-import PyPDF2
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+try:
+    import re2 as regex_engine  # google-re2: linear-time DFA matching, no backtracking
+except ImportError:
+    regex_engine = re
+
+try:
+    import tesserocr  # In-process Tesseract bindings: no tesseract subprocess or image re-encoding per page
+except ImportError:
+    tesserocr = None
 
 REDACTION_PATTERNS = [
     "Ref",
@@ -54,6 +70,157 @@ REDACTION_PATTERNS = [
 # Flag to control case-sensitivity for redaction
 IS_CASE_SENSITIVE_PDF_REDACTION = False
 
+# Zoom factor pages are rendered at for OCR (2 = 144 dpi)
+OCR_ZOOM = 2
+
+# Tesseract page segmentation mode: 6 treats the page as a single uniform block of text.
+# Set to 3 for fully automatic page segmentation (e.g. multi-column layouts).
+OCR_PAGE_SEGMENTATION_MODE = 6
+
+
+# Global inline flags such as "(?i)" at the start of a pattern; they are only valid at the
+# start of an expression, so inside the union they are turned into a scoped (?flags:...) group
+_LEADING_INLINE_FLAGS_RE = re.compile(r"\(\?[aiLmsux]+\)")
+
+def _prepare_search_patterns(words_and_patterns_to_redact):
+    """
+    Converts redaction words/patterns into regex strings.
+    Plain strings are escaped; compiled patterns keep their DOTALL/MULTILINE/VERBOSE/ASCII
+    flags in a scoped group, whether they were passed as flags or inline.
+    Case-insensitivity is not embedded per pattern: it is applied once to the whole
+    union by _compile_search_regexes, following IS_CASE_SENSITIVE_PDF_REDACTION.
+    Each prepared pattern is compiled on its own, so an invalid one is skipped
+    without affecting the others.
+    """
+    search_patterns = []
+    for item in words_and_patterns_to_redact:
+        pattern_string = ""
+        current_flags = 0
+
+        if isinstance(item, str):
+            pattern_string = re.escape(item)
+        elif isinstance(item, re.Pattern):
+            pattern_string = item.pattern
+            # item.flags already includes the leading inline flags, so they can be dropped here
+            while match := _LEADING_INLINE_FLAGS_RE.match(pattern_string):
+                pattern_string = pattern_string[match.end():]
+            current_flags |= (item.flags & (re.DOTALL | re.MULTILINE | re.VERBOSE | re.ASCII))
+        else:
+            print(f"Warning: Skipping invalid redaction pattern type: {item}")
+            continue
+
+        # Scoped flag groups only for patterns that need these flags inside the union
+        flag_str = ""
+        if current_flags & re.ASCII: flag_str += "a"
+        if current_flags & re.DOTALL: flag_str += "s"
+        if current_flags & re.MULTILINE: flag_str += "m"
+        if current_flags & re.VERBOSE: flag_str += "x"
+
+        if flag_str:
+            # In verbose mode a trailing "# comment" would swallow the closing parenthesis
+            closing = "\n)" if current_flags & re.VERBOSE else ")"
+            pattern_string = f"(?{flag_str}:{pattern_string}{closing}"
+        try:
+            re.compile(pattern_string)
+        except (re.error, TypeError) as e:
+            print(f"Warning: Skipping invalid redaction pattern: {item} ({e})")
+            continue
+        search_patterns.append(pattern_string)
+    return tuple(search_patterns)
+
+def _has_group_references(pattern_string):
+    """
+    True if the pattern uses named groups or backreferences. Its group names and numbers
+    would clash with or shift against the other patterns in a union, so it is matched on its own.
+    """
+    if re.compile(pattern_string).groupindex:
+        return True
+
+    def _walk(node):
+        if isinstance(node, sre_parse.SubPattern):
+            node = node.data
+        if isinstance(node, (list, tuple)):
+            if len(node) == 2 and node[0] in (sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS):
+                return True
+            return any(_walk(child) for child in node)
+        return False
+
+    return _walk(sre_parse.parse(pattern_string))
+
+def _literal_anchor(pattern_string):
+    """
+    Returns the longest run of literal characters (lowercased) that every match of the
+    prepared pattern must contain, or "" if no such literal can be derived.
+    """
+    try:
+        items = list(sre_parse.parse(pattern_string))
+    except Exception:
+        return ""
+    # Unwrap scoped-flag groups such as (?s:...) around the whole pattern
+    while len(items) == 1 and items[0][0] is sre_parse.SUBPATTERN:
+        items = list(items[0][1][-1])
+
+    longest = run = ""
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            run += chr(av)
+        else:
+            longest = max(longest, run, key=len)
+            run = ""
+    return max(longest, run, key=len).lower()
+
+@functools.lru_cache(maxsize=None)
+def _pattern_anchors(search_patterns):
+    return tuple(_literal_anchor(s_pattern) for s_pattern in search_patterns)
+
+def _compile_pattern(pattern_string):
+    """
+    Compiles with RE2 when installed and falls back to the standard re module otherwise.
+    """
+    try:
+        return regex_engine.compile(pattern_string)
+    except Exception:
+        # Pattern uses syntax RE2 does not support; use the backtracking engine instead
+        return re.compile(pattern_string)
+
+@functools.lru_cache(maxsize=256)
+def _compile_search_regexes(search_patterns, case_sensitive):
+    """
+    Combines the prepared search patterns into a single alternation so each page
+    is scanned once instead of once per pattern. Patterns with named groups or
+    backreferences are compiled separately. Returns a tuple of compiled regexes.
+    Cached, since pages are matched against the recurring subsets of patterns
+    that survive the anchor check in _find_pattern_rects.
+    """
+    # A single leading (?i) is understood by both engines, unlike re.IGNORECASE
+    case_prefix = "" if case_sensitive else "(?i)"
+    union_patterns = [s_pattern for s_pattern in search_patterns if not _has_group_references(s_pattern)]
+    regexes = [
+        _compile_pattern(case_prefix + s_pattern)
+        for s_pattern in search_patterns if _has_group_references(s_pattern)
+    ]
+    if union_patterns:
+        regexes.insert(0, _compile_pattern(case_prefix + "|".join(f"(?:{s_pattern})" for s_pattern in union_patterns)))
+    return tuple(regexes)
+
+# Prepared once at import since REDACTION_PATTERNS and IS_CASE_SENSITIVE_PDF_REDACTION are module constants
+_PREPARED_SEARCH_PATTERNS = _prepare_search_patterns(REDACTION_PATTERNS)
+_pattern_anchors(_PREPARED_SEARCH_PATTERNS)
+
+# A line containing "Copyright ©" followed by digits (year), together with the line before and the line after it
+_COPYRIGHT_BLOCK_RE = re.compile(r"(?:^[^\n]*\n)?^[^\n]*Copyright ©\s*\d{4}[^\n]*(?:\n[^\n]*)?\n?", re.MULTILINE | re.IGNORECASE)
+
+# Phrases and the word "uptodate" (any case) removed from the remaining text.
+# The full copyright phrase comes first so it is not broken up by the "uptodate" alternative.
+_UNDESIRED_TEXT_RE = re.compile(
+    r"2025© UpToDate, Inc\. and its affiliates and/or licensors\. All Rights Reserved"
+    r"|Contributor Disclosures"
+    r"|For abbreviations, symbols, and age group definitions"
+    r"|show table"
+    r"|\b[Uu][Pp][Tt][Oo][Dd][Aa][Tt][Ee]\b",
+    re.IGNORECASE,
+)
+
 
 def remove_undesired_patterns(text):
     """
@@ -64,185 +231,308 @@ def remove_undesired_patterns(text):
     3. **NEW:** Specific patterns from the extracted text string.
     This is a text-level cleanup, applied after extraction.
     """
-    lines = text.split('\n')
-    output_lines = []
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-
-        # Regex to find "Copyright ©" followed by digits (year)
-        if re.search(r"Copyright ©\s*\d{4}", line, re.IGNORECASE):
-            # Check if the previous line exists and is the same as the last appended line, then remove it
-            if output_lines and i > 0 and (i - 1 < len(lines) and lines[i-1] == output_lines[-1]):
-                output_lines.pop()
-            i += 2 # Skip current line (copyright) and the one after
-            continue # Move to next line in original input
-
-        # Remove "uptodate" and its variations (case-insensitive)
-        cleaned_line = re.sub(r'\b[Uu][Pp][Tt][Oo][Dd][Aa][Tt][Ee]\b', '', line, flags=re.IGNORECASE)
-
-        # --- NEW ADDITIONS: Remove specific patterns from the cleaned_line ---
-        # Using re.sub for each pattern
-        cleaned_line = re.sub(r'2025© UpToDate, Inc\. and its affiliates and/or licensors\. All Rights Reserved', '', cleaned_line, flags=re.IGNORECASE)
-        cleaned_line = re.sub(r'Contributor Disclosures', '', cleaned_line, flags=re.IGNORECASE)
-        cleaned_line = re.sub(r'For abbreviations, symbols, and age group definitions', '', cleaned_line, flags=re.IGNORECASE)
-        cleaned_line = re.sub(r'show table', '', cleaned_line, flags=re.IGNORECASE)
-        # -------------------------------------------------------------------
-
-        output_lines.append(cleaned_line)
-        i += 1
-    return "\n".join(output_lines)
+    # Both passes run over the whole text in C instead of line by line in Python.
+    # The copyright regex tries a two-line match at every line start, so skip it
+    # when the text has no "©" at all (a plain substring scan).
+    if "©" in text:
+        text = _COPYRIGHT_BLOCK_RE.sub("", text)
+    return _UNDESIRED_TEXT_RE.sub("", text)
+
+def _open_pdf(pdf_source):
+    """
+    Opens a PDF with PyMuPDF from either a file path or the raw bytes of the file.
+    """
+    if isinstance(pdf_source, (bytes, bytearray)):
+        return fitz.open(stream=pdf_source, filetype="pdf")
+    return fitz.open(pdf_source)
+
+def _pdf_display_name(pdf_source, pdf_name=None):
+    """
+    Name used in log messages for a PDF given as a path or as bytes.
+    """
+    if pdf_name:
+        return pdf_name
+    if isinstance(pdf_source, (bytes, bytearray)):
+        return "<in-memory PDF>"
+    return os.path.basename(pdf_source)
 
 def remove_pdf_metadata(file_path):
     """
-    Removes metadata from a PDF file using PyPDF2.
+    Removes metadata (Info dictionary and XMP stream) from a PDF file using PyMuPDF.
     Modifies the file in-place (by writing to a temp and replacing).
+    Content streams are copied as they are (no re-deflate), so the cost is mostly parsing.
+    The workflow does not call this: redact_pdf_content strips metadata in its own pass.
     """
+    pdf_name = os.path.basename(file_path)
     try:
-        reader = PyPDF2.PdfReader(file_path)
-        writer = PyPDF2.PdfWriter()
-
-        for page in reader.pages:
-            writer.add_page(page)
-
-        # Add empty metadata to effectively remove existing metadata
-        writer.add_metadata({})
-        temp_path = file_path.replace(".pdf", "_temp_metadata_stripped.pdf")
-
-        with open(temp_path, 'wb') as f:
-            writer.write(f)
-
-        # Replace the original file with the metadata-stripped one
-        os.replace(temp_path, file_path)
-        print(f"Metadata successfully removed from: '{os.path.basename(file_path)}'")
+        doc = fitz.open(file_path)
+        doc.set_metadata({})
+        doc.del_xml_metadata()
+
+        # A full (non-incremental) save is required: an incremental update would leave the
+        # old metadata in the previous revision of the file. garbage=1 drops the orphaned objects.
+        # Appending to the full path keeps the temp file distinct from the input even when
+        # the name does not end in ".pdf", and on the same filesystem for os.replace
+        temp_path = f"{file_path}.metadata_stripped.tmp"
+        try:
+            doc.save(temp_path, garbage=1, encryption=fitz.PDF_ENCRYPT_KEEP)
+            doc.close()
+            # Replace the original file with the metadata-stripped one
+            os.replace(temp_path, file_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        print(f"Metadata successfully removed from: '{pdf_name}'")
         return True
     except Exception as e:
-        print(f"Error while removing metadata from '{os.path.basename(file_path)}': {e}")
+        print(f"Error while removing metadata from '{pdf_name}': {e}")
         traceback.print_exc()
         return False
 
-def redact_pdf_content(input_pdf_path, output_pdf_path, words_and_patterns_to_redact=REDACTION_PATTERNS, case_sensitive=IS_CASE_SENSITIVE_PDF_REDACTION):
+def _find_pattern_rects(page, search_patterns, case_sensitive):
+    """
+    Extracts the characters of a page once, matches all patterns in a single pass over the
+    rebuilt page text and maps each match back to the boxes of the characters it covers.
+    Patterns whose literal anchor does not occur on the page are left out of that pass.
+    Returns one rectangle per run of matched characters on a text line.
+    """
+    raw = page.get_text("rawdict", flags=fitz.TEXTFLAGS_RAWDICT & ~fitz.TEXT_PRESERVE_IMAGES)
+
+    # Rebuild the page text line by line, keeping the box and line of every character.
+    # Lines are joined by newlines, which have no box and so always end a run.
+    parts = []
+    char_boxes = []
+    char_lines = []
+    line_no = 0
+    for block in raw["blocks"]:
+        for line in block.get("lines", ()):
+            if line_no:
+                parts.append("\n")
+                char_boxes.append(None)
+                char_lines.append(None)
+            line_no += 1
+            for span in line["spans"]:
+                for char in span["chars"]:
+                    # Whitespace extends a run of matched characters but not its rectangle
+                    box = None if char["c"].isspace() else char["bbox"]
+                    for c in char["c"]:
+                        parts.append(c)
+                        char_boxes.append(box)
+                        char_lines.append(line_no)
+    if not parts:
+        return []
+    page_text = "".join(parts)
+
+    # A pattern can only match if its literal anchor occurs on the page; a substring test
+    # per pattern is far cheaper than carrying every alternative through the regex scan
+    lowered_text = page_text.lower()
+    candidates = tuple(
+        s_pattern for s_pattern, anchor in zip(search_patterns, _pattern_anchors(search_patterns))
+        if anchor in lowered_text
+    )
+    if not candidates:
+        return []
+
+    # Mark every character covered by a match; overlapping matches mark the same characters once
+    matched = bytearray(len(page_text))
+    for search_re in _compile_search_regexes(candidates, case_sensitive):
+        for match in search_re.finditer(page_text):
+            start, end = match.start(), match.end()
+            matched[start:end] = b"\x01" * (end - start)
+
+    # Merge each run of consecutive matched characters on the same line into one rectangle
+    rects = []
+    run_line = None
+    for idx, is_matched in enumerate(matched):
+        if not is_matched or char_lines[idx] != run_line:
+            run_line = None
+        if not is_matched or char_boxes[idx] is None:
+            continue
+        x0, y0, x1, y1 = char_boxes[idx]
+        if run_line is not None:
+            rects[-1] |= fitz.Rect(x0, y0, x1, y1)
+        else:
+            rects.append(fitz.Rect(x0, y0, x1, y1))
+            run_line = char_lines[idx]
+    return rects
+
+def _search_page(page, page_num, search_patterns, case_sensitive, pdf_name, skip_empty_text_pages=True):
     """
-    Redacts specific content (headers, footers, and defined words/patterns) from a PDF file.
+    Runs the pattern search for one page, reporting (not raising) search errors.
+    With skip_empty_text_pages, pages that reference no fonts (e.g. scanned images)
+    are skipped without extracting their text.
+    """
+    try:
+        # Text needs a font; checking the page resources avoids decoding the content stream
+        if skip_empty_text_pages and not page.get_fonts():
+            return []
+        return _find_pattern_rects(page, search_patterns, case_sensitive)
+    except Exception as e:
+        print(f"Internal pattern search error on page {page_num + 1} of '{pdf_name}': {e}")
+        traceback.print_exc()
+        return []
+
+def _redact_one_page(page, text_instances_found):
+    """
+    Adds the header/footer and pattern redaction annotations to a page and applies them.
+    Returns the number of redactions added.
+    """
+    page_width = page.rect.width
+    page_height = page.rect.height
+    redactions = 0
+
+    # Redact fixed areas (header and footer)
+    header_height = 70
+    footer_height = 70
+    header_rect = fitz.Rect(0, 0, page_width, header_height)
+    footer_rect = fitz.Rect(0, page_height - footer_height, page_width, page_height)
+
+    page.add_redact_annot(header_rect, text="", fill=(0, 0, 0))
+    page.add_redact_annot(footer_rect, text="", fill=(0, 0, 0))
+    redactions += 2
+
+    # Redact pattern matches; no sorting needed since annotation order does not affect the result.
+    # Rects lying entirely inside the header/footer band are already covered; plain float
+    # compares are enough since both bands span the full page width
+    footer_top = page_height - footer_height
+    for rect in text_instances_found:
+        if rect.y1 > header_height and rect.y0 < footer_top:
+            page.add_redact_annot(rect, text="", fill=(0, 0, 0))
+            redactions += 1
+
+    page.apply_redactions()
+    return redactions
+
+def redact_pdf_content(input_pdf, output_pdf_path, words_and_patterns_to_redact=REDACTION_PATTERNS, case_sensitive=IS_CASE_SENSITIVE_PDF_REDACTION, prepared=None, pdf_name=None, skip_empty_text_pages=True, aggressive_gc=False):
+    """
+    Redacts specific content (headers, footers, and defined words/patterns) from a PDF file
+    and removes its metadata in the same pass.
+    `input_pdf` is a file path or the PDF bytes; `pdf_name` names in-memory PDFs in log messages.
     Saves the redacted PDF to a new output path.
     Uses module-level REDACTION_PATTERNS and IS_CASE_SENSITIVE_PDF_REDACTION by default.
+    `prepared` accepts already prepared search patterns (see _prepare_search_patterns).
+    Pages without any text (scanned images) only get the header/footer redaction
+    unless skip_empty_text_pages is False.
+    Set aggressive_gc=True to spend extra time shrinking the output file.
     """
-    print(f"Attempting redaction for '{os.path.basename(input_pdf_path)}'...")
+    in_memory = isinstance(input_pdf, (bytes, bytearray))
+    pdf_name = _pdf_display_name(input_pdf, pdf_name)
+    print(f"Attempting redaction for '{pdf_name}'...")
 
-    if not os.path.exists(input_pdf_path):
-        print(f"Error: Input PDF not found for redaction: '{os.path.basename(input_pdf_path)}'")
+    if not in_memory and not os.path.exists(input_pdf):
+        print(f"Error: Input PDF not found for redaction: '{pdf_name}'")
         return False
 
     try:
-        doc = fitz.open(input_pdf_path)
+        doc = _open_pdf(input_pdf)
         total_redactions = 0
 
-        # Prepare patterns: convert all to regex strings for search_for
-        search_patterns = []
-        for item in words_and_patterns_to_redact:
-            pattern_string = ""
-            current_flags = 0 if case_sensitive else re.IGNORECASE
-
-            if isinstance(item, str):
-                pattern_string = re.escape(item)
-            elif isinstance(item, re.Pattern):
-                pattern_string = item.pattern
-                if not case_sensitive and not (item.flags & re.IGNORECASE):
-                    current_flags |= re.IGNORECASE
-                current_flags |= (item.flags & (re.DOTALL | re.MULTILINE | re.UNICODE))
-            else:
-                print(f"Warning: Skipping invalid redaction pattern type: {item}")
-                continue
-            
-            flag_str = ""
-            if current_flags & re.IGNORECASE: flag_str += "i"
-            if current_flags & re.DOTALL: flag_str += "s"
-            if current_flags & re.MULTILINE: flag_str += "m"
-            if current_flags & re.UNICODE: flag_str += "u"
-
-            if flag_str:
-                search_patterns.append(f"(?{flag_str}){pattern_string}")
-            else:
-                search_patterns.append(pattern_string)
+        # Strip metadata here so the PDF is parsed and written only once
+        doc.set_metadata({})
+        doc.del_xml_metadata()
 
+        # Patterns are prepared once at import; only custom pattern lists need preparing here
+        if prepared is None:
+            if words_and_patterns_to_redact is REDACTION_PATTERNS:
+                prepared = _PREPARED_SEARCH_PATTERNS
+            else:
+                prepared = _prepare_search_patterns(words_and_patterns_to_redact)
+        prepared = tuple(prepared) # Hashable for the anchor and union caches
 
         for page_num in range(doc.page_count):
             page = doc.load_page(page_num)
-            page_width = page.rect.width
-            page_height = page.rect.height
-
-            # Redact fixed areas (header and footer)
-            header_height = 70
-            footer_height = 70
-            header_rect = fitz.Rect(0, 0, page_width, header_height)
-            footer_rect = fitz.Rect(0, page_height - footer_height, page_width, page_height)
-
-            page.add_redact_annot(header_rect, text="", fill=(0, 0, 0))
-            page.add_redact_annot(footer_rect, text="", fill=(0, 0, 0))
-            total_redactions += 2
 
             # Redact specific text patterns
-            text_instances_found = []
-            for s_pattern in search_patterns:
-                try:
-                    text_instances_found.extend(page.search_for(s_pattern, flags=fitz.TEXT_PRESERVE_WHITESPACE))
-                except Exception as e:
-                    print(f"Internal PyMuPDF search error for pattern '{s_pattern}' on page {page_num + 1} of '{os.path.basename(input_pdf_path)}': {e}")
-                    traceback.print_exc()
-                    continue 
-
-            # Consolidate and apply redactions
-            redaction_rects = sorted([inst for inst in text_instances_found], key=lambda r: (r.y0, r.x0))
-
-            for rect in redaction_rects:
-                if not header_rect.intersects(rect) and not footer_rect.intersects(rect):
-                    page.add_redact_annot(rect, text="", fill=(0, 0, 0))
-                    total_redactions += 1
+            if prepared:
+                text_instances_found = _search_page(page, page_num, prepared, case_sensitive, pdf_name, skip_empty_text_pages)
+            else:
+                text_instances_found = []
 
-            page.apply_redactions()
+            total_redactions += _redact_one_page(page, text_instances_found)
 
         if total_redactions > 0:
-            doc.save(output_pdf_path, garbage=4, deflate=True)
+            # garbage=1 drops unreferenced objects (including the replaced metadata and page
+            # content), which is all redaction needs; garbage=4 also deduplicates objects and
+            # compacts the xref for a smaller file at a much higher cost on large PDFs
+            doc.save(output_pdf_path, garbage=4 if aggressive_gc else 1, deflate=True)
             doc.close()
             print(f"Successfully applied {total_redactions} redaction(s) and saved redacted PDF to '{os.path.basename(output_pdf_path)}'.")
             return True
         else:
             doc.close()
-            shutil.copy(input_pdf_path, output_pdf_path)
-            print(f"No specific content or fixed area redactions applied for '{os.path.basename(input_pdf_path)}'. Copied original.")
+            if in_memory:
+                with open(output_pdf_path, 'wb') as f:
+                    f.write(input_pdf)
+            else:
+                shutil.copy(input_pdf, output_pdf_path)
+            print(f"No specific content or fixed area redactions applied for '{pdf_name}'. Copied original.")
             return True
     except Exception as e:
-        print(f"Error during redaction of '{os.path.basename(input_pdf_path)}': {e}")
+        print(f"Error during redaction of '{pdf_name}': {e}")
         traceback.print_exc()
         return False
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+# One Tesseract API per process, reused across pages so the language model is loaded once.
+# It lives until the process exits; the OS reclaims its memory then.
+_TESS_API = None
+
+def _get_tess_api():
+    global _TESS_API
+    if _TESS_API is None:
+        api_kwargs = {"lang": "eng", "psm": OCR_PAGE_SEGMENTATION_MODE, "oem": tesserocr.OEM.LSTM_ONLY}
+        if os.environ.get("TESSDATA_PREFIX"):
+            api_kwargs["path"] = os.environ["TESSDATA_PREFIX"] # Same tessdata as the tesseract CLI
+        _TESS_API = tesserocr.PyTessBaseAPI(**api_kwargs)
+    return _TESS_API
+
+def _ocr_page(page):
+    """
+    Renders a single page in grayscale and runs Tesseract OCR on it, in-process through
+    tesserocr when installed, otherwise through pytesseract.
+    """
+    dpi = round(72 * OCR_ZOOM) # Actual resolution of the rendered image, passed on to Tesseract
+    pix = page.get_pixmap(matrix=fitz.Matrix(OCR_ZOOM, OCR_ZOOM), colorspace=fitz.csGRAY, alpha=False) # Increase resolution for better OCR
+
+    if tesserocr is not None:
+        # Hand the raw pixmap buffer straight to Tesseract, no PIL copy or temp file
+        api = _get_tess_api()
+        api.SetImageBytes(pix.samples, pix.width, pix.height, pix.n, pix.stride)
+        api.SetSourceResolution(dpi)
+        return api.GetUTF8Text()
+
+    img = Image.frombytes("L", [pix.width, pix.height], pix.samples)
+    return pytesseract.image_to_string(img, config=f'--oem 1 --psm {OCR_PAGE_SEGMENTATION_MODE} --dpi {dpi}') # OEM 1: LSTM engine only
+
+# Per-process document handle for page-parallel OCR
+_OCR_DOC = None
+
+def _init_ocr_worker(pdf_path):
+    global _OCR_DOC
+    _OCR_DOC = fitz.open(pdf_path)
+    if tesserocr is not None:
+        _get_tess_api() # Load the language model while the pool starts, not on the first page
+
+def _ocr_page_worker(page_num):
+    return _ocr_page(_OCR_DOC.load_page(page_num))
+
+def extract_text_from_pdf(pdf_path: str, max_workers=None) -> str:
     """
     Extracts text from a PDF file using PyMuPDF and compulsory OCR via Tesseract.
+    Pages are OCR'd in up to `max_workers` processes (default: CPU count) and
+    joined in page order; pass max_workers=1 to OCR in-process.
     Returns raw extracted text. Cleanup (remove_undesired_patterns) happens later.
     """
-    text = ""
     try:
         doc = fitz.open(pdf_path)
-        for page_num, page in enumerate(doc):
-            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2)) # Increase resolution for better OCR
-            
-            if pix.n == 1:
-                mode = "L"
-            elif pix.n == 3:
-                mode = "RGB"
-            elif pix.n == 4:
-                mode = "RGBA"
-            else:
-                print(f"Warning: Unsupported number of color channels ({pix.n}) in PDF page {page_num+1} of '{os.path.basename(pdf_path)}'. Skipping OCR for this page.")
-                continue
-            
-            img = Image.frombytes(mode, [pix.width, pix.height], pix.samples)
-            
-            # Use a higher DPI for Tesseract for potentially better accuracy
-            page_text = pytesseract.image_to_string(img, config='--psm 3 --dpi 300') # PSM 3 for automatic page segmentation
-            text += page_text + "\n"
+        workers = min(max_workers or os.cpu_count() or 1, doc.page_count)
+        if workers > 1:
+            # Tesseract is CPU-bound and pages are independent, so spread them over processes
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_ocr_worker, initargs=(pdf_path,)) as executor:
+                page_texts = list(executor.map(_ocr_page_worker, range(doc.page_count)))
+        else:
+            page_texts = [_ocr_page(page) for page in doc]
         doc.close()
+        text = "".join(page_text + "\n" for page_text in page_texts)
 
     except Exception as e:
         print(f"Error extracting text from PDF '{os.path.basename(pdf_path)}' using OCR: {e}. Ensure Tesseract OCR is installed and configured correctly (e.g., added to system PATH).")
@@ -1,41 +1,129 @@
 import zipfile
 import os
+import io
 import shutil
 import re
 import sys
 import traceback
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import pytesseract # Make sure pytesseract is imported for the Tesseract check
 
 
 from func_to_import import (
     remove_undesired_patterns,
-    remove_pdf_metadata,
     redact_pdf_content,
     extract_text_from_pdf,
     REDACTION_PATTERNS,
     IS_CASE_SENSITIVE_PDF_REDACTION
 )
 
+def _unique_output_names(members):
+    """
+    Names the outputs of each PDF member after its basename, adding a numeric suffix when
+    several members share one (compared case-insensitively, as on Windows/macOS file systems),
+    so that PDFs processed in parallel never write to the same files.
+    Suffixed names also avoid the basenames of all other members, so only duplicates are renamed.
+    """
+    reserved = {os.path.basename(member).lower() for member in members}
+    taken = set()
+    output_names = []
+    for member in members:
+        base_name = os.path.basename(member)
+        stem, ext = base_name.rsplit(".", 1)
+        output_name = base_name
+        suffix = 0
+        while output_name.lower() in taken or (suffix and output_name.lower() in reserved):
+            suffix += 1
+            output_name = f"{stem}_{suffix}.{ext}"
+        taken.add(output_name.lower())
+        output_names.append(output_name)
+    return output_names
+
+def _process_one_pdf(zip_file_path, member, output_name, redacted_pdf_dir, text_output_dir, page_workers=None):
+    """
+    Runs the per-PDF steps of the workflow for a single PDF member of the ZIP,
+    naming its outputs after `output_name` (see _unique_output_names).
+    Everything printed while processing it, including the messages and tracebacks of
+    the func_import helpers, is captured instead of going straight to the console.
+    Returns (base_name, succeeded, log); the caller prints the log so that messages
+    of PDFs processed in parallel do not interleave.
+    `page_workers` is passed on to the page-parallel OCR.
+    """
+    base_name = output_name
+    log = io.StringIO()
+    with redirect_stdout(log), redirect_stderr(log):
+        print(f"\n--- Processing '{base_name}' ---")
+        try:
+            succeeded = _run_pdf_steps(zip_file_path, member, base_name, redacted_pdf_dir, text_output_dir, page_workers)
+        except Exception as e:
+            print(f"ERROR: An unexpected error occurred while processing '{base_name}': {e}")
+            traceback.print_exc()
+            succeeded = False
+    return base_name, succeeded, log.getvalue()
+
+def _run_pdf_steps(zip_file_path, member, base_name, redacted_pdf_dir, text_output_dir, page_workers=None):
+    """
+    Redaction with metadata removal, OCR, text cleanup and saving for one PDF member.
+    The member is read straight from the archive into memory; only the redacted PDF
+    and the text output are written to disk.
+    Returns True if the text output was saved.
+    """
+    # Each worker reads its own member, so PDF bytes are neither buffered in the parent
+    # nor copied to the worker through the process pool
+    with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+        pdf_data = zip_ref.read(member)
+
+    # Step 1: Redact PDF content and remove metadata (outputs a new redacted PDF)
+    redacted_name = f"redacted_{base_name}"
+    redacted_pdf_path = os.path.join(redacted_pdf_dir, redacted_name)
+    print("INFO: Step 1: Removing PDF metadata and redacting PDF content (headers, footers, and specified patterns)...")
+    # Use the imported REDACTION_PATTERNS and IS_CASE_SENSITIVE_PDF_REDACTION
+    redacted = redact_pdf_content(pdf_data, redacted_pdf_path, REDACTION_PATTERNS, IS_CASE_SENSITIVE_PDF_REDACTION, pdf_name=base_name) # Call from func_import
+    if not redacted:
+        print(f"ERROR: Failed to redact '{base_name}'. Skipping further processing for this PDF.")
+        return False
+
+    # Step 2: Extract text from redacted PDF using OCR
+    print("INFO: Step 2: Extracting text from redacted PDF using OCR...")
+    extracted_text = extract_text_from_pdf(redacted_pdf_path, max_workers=page_workers) # Call from func_import
+    if not extracted_text:
+        print(f"ERROR: Failed to extract text from '{redacted_name}'.")
+        return False
+
+    # Step 3: Further cleanup of extracted text (e.g., remove "uptodate" variations)
+    print("INFO: Step 3: Performing text-level cleanup (e.g., removing 'uptodate')...")
+    cleaned_text = remove_undesired_patterns(extracted_text) # Call from func_import
+
+    # Step 4: Save the cleaned text to a .txt file
+    # Members are filtered on their ".pdf" extension, so a plain split is enough here
+    txt_name = f"{base_name.rsplit('.', 1)[0]}.txt"
+    output_txt_file = os.path.join(text_output_dir, txt_name)
+    with open(output_txt_file, 'w', encoding='utf-8') as f:
+        f.write(cleaned_text)
+    print(f"INFO: Successfully processed and saved text for '{base_name}' to '{txt_name}'.")
+    return True
+
 def process_zip_file_workflow(zip_file_path, output_base_dir="processed_output"):
     """
     Orchestrates the entire process of handling a ZIP file containing PDFs:
-    1. Extracts PDFs.
-    2. Removes metadata from PDFs using func_import.remove_pdf_metadata.
-    3. Redacts specified content (headers, footers, and patterns) from PDFs
-       using func_import.redact_pdf_content.
-    4. Extracts text from redacted PDFs using OCR via func_import.extract_text_from_pdf.
-    5. Cleans up extracted text using func_import.remove_undesired_patterns.
-    6. Saves the cleaned text to a .txt file.
+    1. Reads each PDF from the ZIP into memory (nothing is extracted to disk).
+    2. Removes metadata and redacts specified content (headers, footers, and patterns)
+       from PDFs in a single pass using func_import.redact_pdf_content.
+    3. Extracts text from redacted PDFs using OCR via func_import.extract_text_from_pdf.
+    4. Cleans up extracted text using func_import.remove_undesired_patterns.
+    5. Saves the cleaned text to a .txt file.
+    Returns True only if every PDF was processed; PDFs that fail are reported and skipped.
     """
     # Create necessary output directories
     os.makedirs(output_base_dir, exist_ok=True)
-    extracted_pdf_dir = os.path.join(output_base_dir, "extracted_pdfs")
-    os.makedirs(extracted_pdf_dir, exist_ok=True)
     redacted_pdf_dir = os.path.join(output_base_dir, "redacted_pdfs")
     os.makedirs(redacted_pdf_dir, exist_ok=True)
     text_output_dir = os.path.join(output_base_dir, "text_output")
     os.makedirs(text_output_dir, exist_ok=True)
 
+    zip_name = os.path.basename(zip_file_path)
     try:
         if not os.path.exists(zip_file_path):
             print(f"ERROR: ZIP file not found at '{zip_file_path}'")
@@ -43,72 +131,54 @@ def process_zip_file_workflow(zip_file_path, output_base_dir="processed_output")
 
         with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
             pdf_files_in_zip = []
-            for member in zip_ref.namelist():
-                if member.lower().endswith(".pdf"):
-                    # Extract PDF to a temporary location for initial processing
-                    extracted_path = os.path.join(extracted_pdf_dir, os.path.basename(member))
-                    os.makedirs(os.path.dirname(extracted_path), exist_ok=True) # Ensure directory exists
-                    
-                    with zip_ref.open(member) as source, open(extracted_path, 'wb') as target:
-                        shutil.copyfileobj(source, target)
-                    pdf_files_in_zip.append(extracted_path)
-                    print(f"INFO: Extracted PDF: {os.path.basename(member)}")
+            for member in zip_ref.infolist():
+                if not member.is_dir() and member.filename.lower().endswith(".pdf"):
+                    pdf_files_in_zip.append(member.filename)
 
             if not pdf_files_in_zip:
-                print(f"WARNING: No PDF files found in '{os.path.basename(zip_file_path)}'.")
+                print(f"WARNING: No PDF files found in '{zip_name}'.")
                 return False
 
-            for pdf_path in pdf_files_in_zip:
-                base_name = os.path.basename(pdf_path)
-                print(f"\n--- Processing '{base_name}' ---")
-
-                # Step 1: Remove PDF metadata (in-place modification)
-                print("INFO: Step 1: Removing PDF metadata...")
-                metadata_removed = remove_pdf_metadata(pdf_path) # Call from func_import
-                if not metadata_removed:
-                    print(f"ERROR: Failed to remove metadata from '{base_name}'. Skipping further processing for this PDF.")
-                    continue
-
-                # Step 2: Redact PDF content (outputs a new redacted PDF)
-                redacted_pdf_path = os.path.join(redacted_pdf_dir, f"redacted_{base_name}")
-                print("INFO: Step 2: Redacting PDF content (headers, footers, and specified patterns)...")
-                # Use the imported REDACTION_PATTERNS and IS_CASE_SENSITIVE_PDF_REDACTION
-                redacted = redact_pdf_content(pdf_path, redacted_pdf_path, REDACTION_PATTERNS, IS_CASE_SENSITIVE_PDF_REDACTION) # Call from func_import
-                if not redacted:
-                    print(f"ERROR: Failed to redact '{base_name}'. Skipping further processing for this PDF.")
-                    continue
-
-                # Step 3: Extract text from redacted PDF using OCR
-                print("INFO: Step 3: Extracting text from redacted PDF using OCR...")
-                extracted_text = extract_text_from_pdf(redacted_pdf_path) # Call from func_import
-                if not extracted_text:
-                    print(f"ERROR: Failed to extract text from '{os.path.basename(redacted_pdf_path)}'.")
-                    continue
-
-                # Step 4: Further cleanup of extracted text (e.g., remove "uptodate" variations)
-                print("INFO: Step 4: Performing text-level cleanup (e.g., removing 'uptodate')...")
-                cleaned_text = remove_undesired_patterns(extracted_text) # Call from func_import
-
-                # Step 5: Save the cleaned text to a .txt file
-                output_txt_file = os.path.join(text_output_dir, f"{os.path.splitext(base_name)[0]}.txt")
-                with open(output_txt_file, 'w', encoding='utf-8') as f:
-                    f.write(cleaned_text)
-                print(f"INFO: Successfully processed and saved text for '{base_name}' to '{os.path.basename(output_txt_file)}'.")
-
-        print(f"INFO: All PDFs from '{os.path.basename(zip_file_path)}' processed successfully!")
+            output_names = _unique_output_names(pdf_files_in_zip)
+            for member, output_name in zip(pdf_files_in_zip, output_names):
+                if output_name == os.path.basename(member):
+                    print(f"INFO: Found PDF: {output_name}")
+                else:
+                    print(f"INFO: Found PDF: {member} (name already taken, outputs saved as '{output_name}')")
+
+            # PDFs are independent, so process them in parallel. With several PDFs in flight
+            # the page-level work inside each one stays in-process to avoid oversubscribing cores.
+            workers = min(len(pdf_files_in_zip), os.cpu_count() or 1)
+            failed_pdfs = []
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    for base_name, succeeded, log in executor.map(_process_one_pdf, repeat(zip_file_path), pdf_files_in_zip, output_names, repeat(redacted_pdf_dir), repeat(text_output_dir), repeat(1)):
+                        print(log, end="")
+                        if not succeeded:
+                            failed_pdfs.append(base_name)
+            else:
+                for member, output_name in zip(pdf_files_in_zip, output_names):
+                    base_name, succeeded, log = _process_one_pdf(zip_file_path, member, output_name, redacted_pdf_dir, text_output_dir)
+                    print(log, end="")
+                    if not succeeded:
+                        failed_pdfs.append(base_name)
+
+        if failed_pdfs:
+            print(f"WARNING: {len(failed_pdfs)} of {len(pdf_files_in_zip)} PDF(s) from '{zip_name}' could not be fully processed: {', '.join(failed_pdfs)}")
+            return False
+
+        print(f"INFO: All PDFs from '{zip_name}' processed successfully!")
         return True
 
     except zipfile.BadZipFile:
-        print(f"ERROR: '{os.path.basename(zip_file_path)}' is not a valid ZIP file.")
+        print(f"ERROR: '{zip_name}' is not a valid ZIP file.")
         return False
     except Exception as e:
         print(f"ERROR: An unexpected error occurred during processing: {e}")
         traceback.print_exc() # Print full traceback for unexpected errors
         return False
     finally:
-        # Optional: Clean up the extracted_pdfs and redacted_pdfs directories if you don't need them for debugging
-        # if os.path.exists(extracted_pdf_dir):
-        #     shutil.rmtree(extracted_pdf_dir)
+        # Optional: Clean up the redacted_pdfs directory if you don't need it for debugging
         # if os.path.exists(redacted_pdf_dir):
         #     shutil.rmtree(redacted_pdf_dir)
         pass
@@ -149,8 +219,7 @@ if __name__ == "__main__":
     if success:
         print("\n--- Processing completed successfully! ---")
         print(f"Output files can be found in the directory: {os.path.abspath(full_output_path)}")
-        print(f"  - Extracted PDFs (metadata removed): '{output_folder_name}/extracted_pdfs'")
         print(f"  - Redacted PDFs: '{output_folder_name}/redacted_pdfs'")
         print(f"  - Final text outputs: '{output_folder_name}/text_output'")
     else:
-        print("\n--- Processing failed. Please check the messages above for details. ---")
+        print("\n--- Processing failed for some or all PDFs. Please check the messages above for details. ---")